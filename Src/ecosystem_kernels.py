@@ -0,0 +1,342 @@
+# ecosystem_kernels.py
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional: fall back to plain Python functions
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# State vector layout
+STATE_KEYS = ('crop', 'weed', 'pest', 'bird', 'bat', 'soil_nutrient',
+              'soil_health', 'herbicide_residue', 'pesticide_residue')
+CROP, WEED, PEST, BIRD, BAT, SOIL_NUTRIENT, SOIL_HEALTH, HERBICIDE_RES, PESTICIDE_RES = range(9)
+N_STATES = len(STATE_KEYS)
+
+# Packed parameter layout
+PARAM_KEYS = ('r_crop', 'r_weed', 'r_pest', 'r_bird', 'r_bat',
+              'K_crop', 'K_weed', 'K_pest', 'K_bird', 'K_bat',
+              'pest_on_crop', 'bird_on_pest', 'bat_on_pest', 'crop_weed_comp',
+              'herbicide_decay', 'pesticide_decay',
+              'organic_fertilizer_effect', 'chemical_fertilizer_effect',
+              'herbicide_effect', 'pesticide_effect',
+              'predator_pesticide_mortality')
+(P_R_CROP, P_R_WEED, P_R_PEST, P_R_BIRD, P_R_BAT,
+ P_K_CROP, P_K_WEED, P_K_PEST, P_K_BIRD, P_K_BAT,
+ P_PEST_ON_CROP, P_BIRD_ON_PEST, P_BAT_ON_PEST, P_CROP_WEED_COMP,
+ P_HERBICIDE_DECAY, P_PESTICIDE_DECAY,
+ P_ORGANIC_FERTILIZER_EFFECT, P_CHEMICAL_FERTILIZER_EFFECT,
+ P_HERBICIDE_EFFECT, P_PESTICIDE_EFFECT,
+ P_PREDATOR_PESTICIDE_MORTALITY) = range(len(PARAM_KEYS))
+
+# Scenario flag bits (bit i <-> FLAG_KEYS[i])
+FLAG_KEYS = ('use_herbicide', 'use_pesticide', 'use_fertilizer',
+             'introduce_bats', 'introduce_birds',
+             'use_organic_fertilizer', 'use_cover_crop')
+(USE_HERBICIDE, USE_PESTICIDE, USE_FERTILIZER, INTRODUCE_BATS, INTRODUCE_BIRDS,
+ USE_ORGANIC_FERTILIZER, USE_COVER_CROP) = (1 << i for i in range(len(FLAG_KEYS)))
+
+# Stop year columns of the batched scenario stop-year matrix
+STOP_HERBICIDE, STOP_PESTICIDE = range(2)
+
+# Stop year used when a chemical is never discontinued
+NO_STOP_YEAR = 1 << 30
+
+# Seasons
+SEASONS = ('spring', 'summer', 'autumn', 'winter')
+SPRING, SUMMER, AUTUMN, WINTER = range(4)
+
+
+def pack_params(params):
+    """Pack a parameter dict into a flat float tuple (PARAM_KEYS order)"""
+    return tuple(float(params[key]) for key in PARAM_KEYS)
+
+
+def pack_season_factors(season_factors):
+    """Flatten a {season: factor} dict into a tuple indexed by season (SEASONS order)"""
+    return tuple(float(season_factors[season]) for season in SEASONS)
+
+
+def pack_flags(scenario_config):
+    """Pack scenario booleans into an int bitfield (FLAG_KEYS order)"""
+    flags = 0
+    for bit, key in enumerate(FLAG_KEYS):
+        if scenario_config.get(key, False):
+            flags |= 1 << bit
+    return flags
+
+
+def pack_stop_year(stop_year):
+    """Map an optional stop year to an int (None -> never stop)"""
+    return NO_STOP_YEAR if stop_year is None else int(stop_year)
+
+
+@njit(inline='always')
+def fmin(a, b):
+    """Two-argument min as a compare-and-select (lowered to minsd under fastmath)"""
+    return a if a < b else b
+
+
+@njit(inline='always')
+def fmax(a, b):
+    """Two-argument max as a compare-and-select (lowered to maxsd under fastmath)"""
+    return a if a > b else b
+
+
+@njit(cache=True, fastmath=True)
+def handle_spring_operations(states, flags):
+    """Handle spring farming operations"""
+    states[CROP] = 80.0
+
+    if flags & USE_FERTILIZER:
+        apply_fertilizer(states, flags)
+
+
+@njit(cache=True, fastmath=True)
+def apply_fertilizer(states, flags):
+    """Apply fertilizer"""
+    if flags & USE_ORGANIC_FERTILIZER:
+        states[SOIL_NUTRIENT] += 15
+        states[SOIL_HEALTH] = fmin(100.0, states[SOIL_HEALTH] + 2)
+    else:
+        states[SOIL_NUTRIENT] += 30
+        states[SOIL_HEALTH] = fmax(0.0, states[SOIL_HEALTH] - 1)
+
+
+@njit(cache=True, fastmath=True)
+def handle_summer_operations(states, params, year, flags,
+                             herbicide_stop_year, pesticide_stop_year):
+    """Handle summer farming operations"""
+    if should_apply_pesticide(states, year, flags, pesticide_stop_year):
+        apply_pesticide(states, params)
+    if should_apply_herbicide(states, year, flags, herbicide_stop_year):
+        apply_herbicide(states, params)
+    else:
+        apply_organic_weed_control(states, year, flags)
+
+
+@njit(cache=True, fastmath=True)
+def should_apply_pesticide(states, year, flags, stop_year):
+    """Determine whether to apply pesticide"""
+    return (flags & USE_PESTICIDE) != 0 and states[PEST] > 8 and year < stop_year
+
+
+@njit(cache=True, fastmath=True)
+def should_apply_herbicide(states, year, flags, stop_year):
+    """Determine whether to apply herbicide"""
+    return (flags & USE_HERBICIDE) != 0 and states[WEED] > 15 and year < stop_year
+
+
+@njit(cache=True, fastmath=True)
+def apply_pesticide(states, params):
+    """Apply pesticide"""
+    # Set residue concentration and target population mortality
+    states[PESTICIDE_RES] = 50.0
+    states[PEST] *= (1 - params[P_PESTICIDE_EFFECT])
+
+    # Pesticide side effects on predators
+    survival = 1 - params[P_PREDATOR_PESTICIDE_MORTALITY]
+    states[BIRD] *= survival
+    states[BAT] *= survival
+
+
+@njit(cache=True, fastmath=True)
+def apply_herbicide(states, params):
+    """Apply herbicide"""
+    states[HERBICIDE_RES] = 40.0
+    states[WEED] *= (1 - params[P_HERBICIDE_EFFECT])
+
+
+@njit(cache=True, fastmath=True)
+def apply_organic_weed_control(states, year, flags):
+    """Organic weed control methods"""
+    weed = states[WEED]
+
+    # 1. Manual/mechanical weeding
+    if weed > 20:
+        efficiency = fmin(0.5, 0.25 + 0.03 * fmin(8, year))
+        states[WEED] *= (1 - efficiency)
+
+    # 2. Cover crop competition
+    if flags & USE_COVER_CROP:
+        states[WEED] *= 0.8
+
+    # 3. Crop density suppression
+    crop_density_effect = fmin(0.3, states[CROP] * 0.001)
+    states[WEED] *= (1 - crop_density_effect)
+
+    states[WEED] = fmax(0.0, states[WEED])
+
+
+@njit(cache=True, fastmath=True)
+def update_populations(states, params, season_factor, year, flags):
+    """Update all populations"""
+    C, W, P, B, T = states[CROP], states[WEED], states[PEST], states[BIRD], states[BAT]
+
+    crop_rate = calculate_crop_growth(states, params, C, W, P, flags)
+    weed_rate = calculate_weed_growth(states, params, W, C)
+    pest_rate = calculate_pest_growth(states, params, P, B, T, year)
+    bird_rate = calculate_bird_growth(states, params, B, P) if B > 0 else 0.0
+    bat_rate = calculate_bat_growth(params, T, P) if T > 0 else 0.0
+
+    # Apply season factors
+    states[CROP] = fmax(0.0, states[CROP] + crop_rate * season_factor)
+    states[WEED] = fmax(0.0, states[WEED] + weed_rate * season_factor)
+    states[PEST] = fmax(0.0, states[PEST] + pest_rate * season_factor)
+    states[BIRD] = fmax(0.0, states[BIRD] + bird_rate * season_factor)
+    states[BAT] = fmax(0.0, states[BAT] + bat_rate * season_factor)
+
+    handle_predator_recovery(states, params, flags)
+
+
+@njit(cache=True, fastmath=True)
+def calculate_crop_growth(states, params, C, W, P, flags):
+    """Calculate crop growth rate"""
+    # Base logistic growth
+    base = params[P_R_CROP] * C * (1 - C / params[P_K_CROP])
+
+    # Negative effects (pests and weeds)
+    pest_effect = fmin(0.6, abs(params[P_PEST_ON_CROP]) * P * 0.02)
+    weed_effect = fmin(0.5, abs(params[P_CROP_WEED_COMP]) * W * 0.03)
+
+    # Net growth rate
+    net = fmax(0.05, base * (1 - pest_effect - weed_effect))
+
+    # Soil health factor
+    soil_factor = 0.5 + (states[SOIL_HEALTH] / 100) * 0.5
+
+    # Fertilizer bonus
+    fertilizer_bonus = 0.0
+    if flags & USE_FERTILIZER:
+        if flags & USE_ORGANIC_FERTILIZER:
+            effect = params[P_ORGANIC_FERTILIZER_EFFECT]
+        else:
+            effect = params[P_CHEMICAL_FERTILIZER_EFFECT]
+        fertilizer_bonus = effect * states[SOIL_NUTRIENT] * 0.01
+
+    return net * soil_factor + fertilizer_bonus
+
+
+@njit(cache=True, fastmath=True)
+def calculate_weed_growth(states, params, W, C):
+    """Calculate weed growth rate"""
+    base = params[P_R_WEED] * W * (1 - W / params[P_K_WEED])
+    crop_competition = fmin(0.5, 0.05 + C * 0.001)
+    herbicide_effect = -0.05 * states[HERBICIDE_RES]
+
+    return base * (1 - crop_competition) + herbicide_effect
+
+
+@njit(cache=True, fastmath=True)
+def calculate_pest_growth(states, params, P, B, T, year):
+    """Calculate pest growth rate"""
+    base = params[P_R_PEST] * P * (1 - P / params[P_K_PEST])
+
+    # Predator predation efficiency
+    bird_efficiency = fmin(0.6, 0.3 + 0.02 * year)
+    bat_efficiency = fmin(0.5, 0.25 + 0.015 * year)
+
+    predation = bird_efficiency * B * 0.05 + bat_efficiency * T * 0.04
+    pesticide_effect = -0.01 * states[PESTICIDE_RES]
+
+    return base * (1 - predation) + pesticide_effect
+
+
+@njit(cache=True, fastmath=True)
+def calculate_bird_growth(states, params, B, P):
+    """Calculate bird growth rate"""
+    food_effect = fmin(0.2, P / 50.0)
+    growth = params[P_R_BIRD] * B * (1 - B / params[P_K_BIRD])
+
+    # Birds consume weed seeds
+    states[WEED] *= (1 - fmin(0.1, B * 0.005))
+
+    return growth * (1 + 0.5 * food_effect)
+
+
+@njit(cache=True, fastmath=True)
+def calculate_bat_growth(params, T, P):
+    """Calculate bat growth rate"""
+    food_effect = fmin(0.2, P / 50.0)
+    return params[P_R_BAT] * T * (1 - T / params[P_K_BAT]) * (1 + 0.4 * food_effect)
+
+
+@njit(cache=True, fastmath=True)
+def handle_predator_recovery(states, params, flags):
+    """Handle natural recovery or introduction of predators"""
+    if flags & INTRODUCE_BIRDS:
+        update_predator_population(states, BIRD, 2.0, params[P_R_BIRD], params[P_K_BIRD])
+    if flags & INTRODUCE_BATS:
+        update_predator_population(states, BAT, 1.5, params[P_R_BAT], params[P_K_BAT])
+
+
+@njit(cache=True, fastmath=True)
+def update_predator_population(states, predator, initial, r, K):
+    """Update specific predator population"""
+    if states[predator] == 0:
+        # Initial introduction
+        states[predator] = initial
+    else:
+        # Logistic growth
+        current = states[predator]
+        pest_effect = fmin(0.3, states[PEST] / 100.0)
+
+        growth = r * current * (1 - current / K) * (1 + pest_effect)
+        states[predator] += growth * 0.5  # Quarterly growth rate
+
+
+@njit(cache=True, fastmath=True)
+def update_chemicals(states, params):
+    """Update chemical residues"""
+    # Pesticide degradation
+    states[PESTICIDE_RES] *= (1 - params[P_PESTICIDE_DECAY])
+    states[HERBICIDE_RES] *= (1 - params[P_HERBICIDE_DECAY])
+
+    # Nutrient consumption
+    states[SOIL_NUTRIENT] *= 0.9
+
+
+# Entry points (step_season, simulate, simulate_batch) compile on first call rather
+# than at import; cache=True keeps their machine code in __pycache__, so later runs
+# load it instead of re-running the JIT
+
+@njit(cache=True, fastmath=True)
+def step_season(states, params, season, season_factor, year, flags,
+                herbicide_stop_year, pesticide_stop_year):
+    """Advance the state vector by one season in place"""
+    if season == SPRING:
+        handle_spring_operations(states, flags)
+    elif season == SUMMER:
+        handle_summer_operations(states, params, year, flags,
+                                 herbicide_stop_year, pesticide_stop_year)
+
+    update_populations(states, params, season_factor, year, flags)
+    update_chemicals(states, params)
+
+
+@njit(cache=True, fastmath=True)
+def simulate(states, params, season_factors, flags,
+             herbicide_stop_year, pesticide_stop_year, start_year, n_years):
+    """Run n_years of seasons from start_year, returning one state row per season"""
+    history = np.empty((n_years * 4, N_STATES), dtype=np.float64)
+    t = 0
+    for year in range(start_year, start_year + n_years):
+        for season in range(4):
+            step_season(states, params, season, season_factors[season], year, flags,
+                        herbicide_stop_year, pesticide_stop_year)
+            history[t, :] = states
+            t += 1
+    return history
+
+
+@njit(cache=True, fastmath=True)
+def simulate_batch(initial_states, params, season_factors, flags, stop_years, n_years):
+    """Run each scenario (flag bitfield + stop-year row) from initial_states for n_years"""
+    history = np.empty((flags.shape[0], n_years * 4, N_STATES), dtype=np.float64)
+    for i in range(flags.shape[0]):
+        history[i] = simulate(initial_states.copy(), params, season_factors, flags[i],
+                              stop_years[i, STOP_HERBICIDE], stop_years[i, STOP_PESTICIDE],
+                              0, n_years)
+    return history
\ No newline at end of file
@@ -1,8 +1,7 @@
 import numpy as np
 from matplotlib import pyplot as plt
 
-plt.rcParams['font.sans-serif'] = ['DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+from plotting_common import with_plot_style, show_or_close
 
 # Constant definitions
 SCORING_PARAMS = {
@@ -12,86 +11,153 @@ SCORING_PARAMS = {
 }
 
 
+# History series used by the scores
+ANNUAL_KEYS = ('crop', 'weed', 'pest', 'bird', 'bat', 'soil_health',
+               'herbicide_residue', 'pesticide_residue')
+
+
 def extract_annual_data(history, n_years=30):
-    """Extract annual data from quarterly data"""
-    return {k: [v[i * 4 + 3] for i in range(n_years)] for k, v in history.items()}
+    """Extract annual data from quarterly data (end-of-year strided views)"""
+    return {k: np.asarray(v)[..., 3:n_years * 4:4] for k, v in history.items()}
 
 
-def calculate_ecological_scores(annual_data):
-    """Calculate ecological dimension scores"""
-    last_5 = {k: v[-5:] for k, v in annual_data.items()}
-    last_10 = {k: v[-10:] for k, v in annual_data.items()}
+def stack_annual_data(results, scenario_keys, n_years=30):
+    """Stack the annual series of several scenarios into {key: (n_scenarios, n_years)} arrays"""
+    return {k: np.stack([np.asarray(results[s][k]) for s in scenario_keys])[:, 3:n_years * 4:4]
+            for k in ANNUAL_KEYS}
+
+
+# The scoring functions below reduce over the last axis, so they accept one
+# scenario's series (shape (n_years,)) or stacked scenarios (n_scenarios, n_years);
+# 1-D input gives scalar scores, stacked input one score per scenario
+
+def mean_std(data):
+    """Population mean and standard deviation of short series, sharing the mean"""
+    x = np.asarray(data, dtype=np.float64)
+    mean = x.mean(axis=-1)
+    deviation = x - mean[..., None]
+    return mean, np.sqrt((deviation * deviation).mean(axis=-1))
+
+
+def calculate_summary_statistics(annual_data):
+    """Compute the window means/stds shared by the scoring functions"""
+    crop = annual_data['crop']
+    crop_mean10, crop_std10 = mean_std(crop[..., -10:])
+
+    return {
+        'crop_mean10': crop_mean10,
+        'crop_std10': crop_std10,
+        'crop_std5': mean_std(crop[..., -5:])[1],
+        'bird_mean5': annual_data['bird'][..., -5:].mean(axis=-1),
+        'bat_mean5': annual_data['bat'][..., -5:].mean(axis=-1),
+        'pest_mean5': annual_data['pest'][..., -5:].mean(axis=-1),
+        'weed_mean5': annual_data['weed'][..., -5:].mean(axis=-1)
+    }
 
-    stability = 100 - (np.std(last_10['crop']) / np.mean(last_10['crop']) * 100)
-    biodiversity = min(100, (np.mean(last_5['bird']) * 2 + np.mean(last_5['bat']) * 3) / 50 * 100)
-    pest_control = max(0, 100 - np.mean(last_5['pest']) / 80 * 100)
-    weed_management = max(0, 100 - np.mean(last_5['weed']) / 100 * 100)
+
+def calculate_ecological_scores(annual_data, stats):
+    """Calculate ecological dimension scores"""
+    stability = 100 - (stats['crop_std10'] / stats['crop_mean10'] * 100)
+    biodiversity = np.minimum(100, (stats['bird_mean5'] * 2 + stats['bat_mean5'] * 3) / 50 * 100)
+    pest_control = np.maximum(0, 100 - stats['pest_mean5'] / 80 * 100)
+    weed_management = np.maximum(0, 100 - stats['weed_mean5'] / 100 * 100)
+    final_residue = (np.take(annual_data['herbicide_residue'], -1, axis=-1) +
+                     np.take(annual_data['pesticide_residue'], -1, axis=-1))
 
     return {
         'productivity_stability': stability,
         'biodiversity': biodiversity,
         'pest_control': pest_control,
         'weed_management': weed_management,
-        'soil_health': annual_data['soil_health'][-1],
-        'chemical_free': 100 - min(100, (annual_data['herbicide_residue'][-1] +
-                                         annual_data['pesticide_residue'][-1]) / 50 * 100)
+        'soil_health': np.take(annual_data['soil_health'], -1, axis=-1),
+        'chemical_free': 100 - np.minimum(100, final_residue / 50 * 100)
     }
 
 
-def calculate_economic_scores(annual_data, config):
-    """Calculate economic dimension scores"""
-    avg_yield = np.mean(annual_data['crop'][-10:])
-
-    # Cost calculation
-    costs = sum([
+def calculate_costs(config, final_weed):
+    """Calculate the management cost of one scenario"""
+    return sum([
         SCORING_PARAMS['cost_factors']['herbicide'] if config['use_herbicide'] else 0,
         SCORING_PARAMS['cost_factors']['pesticide'] if config['use_pesticide'] else 0,
         SCORING_PARAMS['cost_factors']['bird'] if config['introduce_birds'] else 0,
         SCORING_PARAMS['cost_factors']['bat'] if config['introduce_bats'] else 0,
-        SCORING_PARAMS['cost_factors']['labor'] if not config['use_herbicide'] and annual_data['weed'][-1] > 20 else 0
+        SCORING_PARAMS['cost_factors']['labor'] if not config['use_herbicide'] and final_weed > 20 else 0
     ])
 
-    cost_efficiency = (avg_yield / costs * 10) if costs > 0 else (avg_yield * 15)
+
+def calculate_economic_scores(costs, stats):
+    """Calculate economic dimension scores (costs: scalar or one per scenario)"""
+    avg_yield = stats['crop_mean10']
+    costs = np.asarray(costs, dtype=np.float64)
+
+    has_costs = costs > 0
+    per_cost = avg_yield / np.where(has_costs, costs, 1) * 10
+    cost_efficiency = np.where(has_costs, per_cost, avg_yield * 15)
 
     return {
         'yield': avg_yield,
-        'cost_efficiency': min(100, cost_efficiency)
+        'cost_efficiency': np.minimum(100, cost_efficiency)
     }
 
 
-def calculate_sustainability_scores(annual_data):
+def calculate_sustainability_scores(annual_data, stats):
     """Calculate sustainability dimension scores"""
     crop_series = annual_data['crop']
-    soil_series = annual_data['soil_health'][::4]  # One point per year
+    soil_series = annual_data['soil_health'][..., ::4]  # One point per year
 
     return {
         'soil_trend': calculate_trend(soil_series),
-        'resilience': calculate_resilience(crop_series[-5:]),
+        'resilience': calculate_resilience(crop_series[..., -5:]),
         'long_term_productivity': calculate_productivity_change(crop_series),
-        'equilibrium': 100 - (np.std(crop_series[-5:]) / 50 * 100)
+        'equilibrium': 100 - (stats['crop_std5'] / 50 * 100)
     }
 
 
 def calculate_trend(data):
-    """Calculate trend of data"""
-    if len(data) < 2:
-        return 0
-    slope, _ = np.polyfit(range(len(data)), data, 1)
+    """Calculate trend of data (least-squares slope, closed form)"""
+    y = np.asarray(data, dtype=np.float64)
+    n = y.shape[-1]
+    if n < 2:
+        return np.zeros(y.shape[:-1])[()]
+    x = np.arange(n, dtype=np.float64)
+    slope = (((x * y).sum(axis=-1) - x.sum() * y.sum(axis=-1) / n) /
+             ((x * x).sum() - x.sum() ** 2 / n))
     return slope * 10
 
 
 def calculate_resilience(data):
     """Calculate system resilience"""
-    if len(data) < 3:
-        return 50
-    corr = np.corrcoef(data[:-1], data[1:])[0, 1]
-    return ((corr + 1) / 2 * 100) if not np.isnan(corr) else 50
+    data = np.asarray(data, dtype=np.float64)
+    if data.shape[-1] < 3:
+        return np.full(data.shape[:-1], 50.0)[()]
+    # Lag-1 Pearson correlation; a constant series has no defined correlation
+    x, y = data[..., :-1], data[..., 1:]
+    dx = x - x.mean(axis=-1)[..., None]
+    dy = y - y.mean(axis=-1)[..., None]
+    denom = np.sqrt((dx * dx).sum(axis=-1) * (dy * dy).sum(axis=-1))
+    corr = (dx * dy).sum(axis=-1) / np.where(denom > 0, denom, 1)
+    return np.where(denom > 0, (corr + 1) / 2 * 100, 50.0)[()]
 
 
 def calculate_productivity_change(crop_series):
     """Calculate long-term productivity change"""
-    first_10, last_10 = crop_series[:10], crop_series[-10:]
-    return (np.mean(last_10) / np.mean(first_10) * 100) if np.mean(first_10) > 0 else 0
+    first_mean = np.mean(crop_series[..., :10], axis=-1)
+    last_mean = np.mean(crop_series[..., -10:], axis=-1)
+    positive = first_mean > 0
+    return np.where(positive, last_mean / np.where(positive, first_mean, 1) * 100, 0.0)[()]
+
+
+def calculate_overall_scores(ecological, economic, sustainability):
+    """Combine the dimension scores into the weighted comprehensive score"""
+    scores = {
+        'ecological': np.mean(np.stack(list(ecological.values())), axis=0) / 100,
+        'economic': economic['cost_efficiency'] / 100,
+        'sustainability': np.mean(np.stack(list(sustainability.values())), axis=0) / 100
+    }
+
+    overall_score = sum(scores[k] * SCORING_PARAMS['weights'][k]
+                        for k in SCORING_PARAMS['weights']) * 100
+    return np.minimum(100, overall_score)
 
 
 def generate_evaluation_summary(scores):
@@ -121,38 +187,69 @@ def generate_evaluation_summary(scores):
     return "; ".join(summaries) if summaries else "System status average"
 
 
-def evaluate_scenario_results(history, scenario_name="", config=None):
-    """Perform multi-dimensional evaluation of simulation results"""
-    annual_data = extract_annual_data(history)
-
-    # Calculate dimension scores
-    ecological = calculate_ecological_scores(annual_data)
-    economic = calculate_economic_scores(annual_data, config) if config else {'yield': 0, 'cost_efficiency': 0}
-    sustainability = calculate_sustainability_scores(annual_data)
-
-    # Calculate comprehensive score
-    scores = {
-        'ecological': np.mean(list(ecological.values())) / 100,
-        'economic': economic['cost_efficiency'] / 100,
-        'sustainability': np.mean(list(sustainability.values())) / 100
-    }
-
-    overall_score = sum(scores[k] * SCORING_PARAMS['weights'][k]
-                        for k in SCORING_PARAMS['weights']) * 100
-
+def _evaluation_record(scenario_name, ecological, economic, sustainability, overall_score):
+    """Assemble one scenario's evaluation result"""
     return {
         'scenario_name': scenario_name,
         'ecological': ecological,
         'economic': economic,
         'sustainability': sustainability,
-        'overall_score': min(100, overall_score),
+        'overall_score': overall_score,
         'summary': generate_evaluation_summary({'ecological': ecological, 'sustainability': sustainability})
     }
 
 
-def plot_result_evaluation(evaluation_results):
+def evaluate_scenario_results(history, scenario_name="", config=None):
+    """Perform multi-dimensional evaluation of simulation results"""
+    annual_data = extract_annual_data(history)
+
+    stats = calculate_summary_statistics(annual_data)
+
+    # Calculate dimension scores
+    ecological = calculate_ecological_scores(annual_data, stats)
+    if config:
+        economic = calculate_economic_scores(calculate_costs(config, annual_data['weed'][-1]), stats)
+    else:
+        economic = {'yield': 0, 'cost_efficiency': 0}
+    sustainability = calculate_sustainability_scores(annual_data, stats)
+
+    overall_score = calculate_overall_scores(ecological, economic, sustainability)
+    return _evaluation_record(scenario_name, ecological, economic, sustainability, overall_score)
+
+
+def evaluate_all_scenarios(results, scenario_configs, n_years=30):
+    """
+    Evaluate all scenarios at once on stacked (n_scenarios, n_years) annual series.
+
+    Returns:
+        List of evaluation results in scenario_configs order, as from evaluate_scenario_results
+    """
+    keys = list(scenario_configs)
+    annual_data = stack_annual_data(results, keys, n_years)
+
+    stats = calculate_summary_statistics(annual_data)
+
+    # Calculate dimension scores for every scenario
+    ecological = calculate_ecological_scores(annual_data, stats)
+    costs = [calculate_costs(scenario_configs[key], final_weed)
+             for key, final_weed in zip(keys, annual_data['weed'][:, -1])]
+    economic = calculate_economic_scores(costs, stats)
+    sustainability = calculate_sustainability_scores(annual_data, stats)
+    overall_scores = calculate_overall_scores(ecological, economic, sustainability)
+
+    # Split into one result per scenario
+    return [_evaluation_record(scenario_configs[key]['name'],
+                               {k: v[i] for k, v in ecological.items()},
+                               {k: v[i] for k, v in economic.items()},
+                               {k: v[i] for k, v in sustainability.items()},
+                               overall_scores[i])
+            for i, key in enumerate(keys)]
+
+
+@with_plot_style
+def plot_result_evaluation(evaluation_results, show=False):
     """Visualize result evaluation"""
-    fig, ax = plt.subplots(figsize=(12, 8))
+    fig, ax = plt.subplots(figsize=(12, 8), layout='constrained')
     fig.suptitle('Scenario Evaluation Results Comparison', fontsize=16, fontweight='bold')
 
     # Extract data
@@ -175,6 +272,5 @@ def plot_result_evaluation(evaluation_results):
         ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 1,
                 f'{score:.1f}', ha='center', va='bottom', fontsize=10)
 
-    plt.tight_layout()
-    plt.savefig('scenario_evaluation.png', dpi=300, bbox_inches='tight')
-    plt.show()
\ No newline at end of file
+    fig.savefig('scenario_evaluation.png', dpi=300)
+    show_or_close(fig, show)
\ No newline at end of file
@@ -1,131 +1,194 @@
-from ecosystem import AgroEcosystem
-from visualization import plot_scenario_comparison, plot_all_scenarios_together
-from evaluation import evaluate_scenario_results, plot_result_evaluation
-
-import warnings
-warnings.filterwarnings('ignore', category=RuntimeWarning)
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from ecosystem import AgroEcosystem, history_dict, scenario_matrices, simulate_scenarios
+from visualization import prepare_plot_arrays, plot_scenario_comparison, plot_all_scenarios_together
+from evaluation import evaluate_all_scenarios, plot_result_evaluation
+from plotting_common import configure_matplotlib
+
+
+# Configurations for the 6 scenarios
+_SCENARIO_LIST = [
+    # ============ Baseline Scenario ============
+    {
+        'id': 'scenario1',
+        'name': 'Conventional Agriculture (High Chemical Input)',
+        'use_herbicide': True, 'use_pesticide': True, 'use_fertilizer': True,
+        'introduce_bats': False, 'introduce_birds': False,
+        'herbicide_stop_year': None, 'pesticide_stop_year': None,
+        'use_organic_fertilizer': False, 'use_cover_crop': False
+    },
+
+    # ============ Single Intervention Tests ============
+    {
+        'id': 'scenario2',
+        'name': 'Chemical Removal Only (No Natural Predators)',
+        'use_herbicide': True, 'use_pesticide': True, 'use_fertilizer': True,
+        'introduce_bats': False, 'introduce_birds': False,
+        'herbicide_stop_year': 3, 'pesticide_stop_year': 2,
+        'use_organic_fertilizer': False, 'use_cover_crop': False
+    },
+    {
+        'id': 'scenario3',
+        'name': 'Chemical Removal + Bat Introduction',
+        'use_herbicide': True, 'use_pesticide': True, 'use_fertilizer': True,
+        'introduce_bats': True, 'introduce_birds': False,
+        'herbicide_stop_year': 3, 'pesticide_stop_year': 2,
+        'use_organic_fertilizer': False, 'use_cover_crop': True
+    },
+    {
+        'id': 'scenario4',
+        'name': 'Chemical Removal + Bird Introduction',
+        'use_herbicide': True, 'use_pesticide': True, 'use_fertilizer': True,
+        'introduce_bats': False, 'introduce_birds': True,
+        'herbicide_stop_year': 3, 'pesticide_stop_year': 2,
+        'use_organic_fertilizer': False, 'use_cover_crop': True
+    },
+
+    # ============ Complete Organic Farming Solutions ============
+    {
+        'id': 'scenario5',
+        'name': 'Gradual Organic Transition',
+        'use_herbicide': True, 'use_pesticide': True, 'use_fertilizer': True,
+        'introduce_bats': True, 'introduce_birds': True,
+        'herbicide_stop_year': 4, 'pesticide_stop_year': 2,
+        'use_organic_fertilizer': True, 'use_cover_crop': True
+    },
+    {
+        'id': 'scenario6',
+        'name': 'Radical Organic (From Beginning)',
+        'use_herbicide': False, 'use_pesticide': False, 'use_fertilizer': False,
+        'introduce_bats': True, 'introduce_birds': True,
+        'herbicide_stop_year': None, 'pesticide_stop_year': None,
+        'use_organic_fertilizer': True, 'use_cover_crop': True
+    }
+]
+
+# Scenario flags/stop years for the batched run, built once from _SCENARIO_LIST
+_FLAG_MATRIX, _STOP_YEARS = scenario_matrices(_SCENARIO_LIST)
+_FLAG_MATRIX.setflags(write=False)
+_STOP_YEARS.setflags(write=False)
 
 
 def create_scenarios():
     """Create configurations for 6 scenarios"""
-    scenarios = [
-        # ============ Baseline Scenario ============
-        {
-            'id': 'scenario1',
-            'name': 'Conventional Agriculture (High Chemical Input)',
-            'use_herbicide': True, 'use_pesticide': True, 'use_fertilizer': True,
-            'introduce_bats': False, 'introduce_birds': False,
-            'herbicide_stop_year': None, 'pesticide_stop_year': None,
-            'use_organic_fertilizer': False, 'use_cover_crop': False
-        },
-
-        # ============ Single Intervention Tests ============
-        {
-            'id': 'scenario2',
-            'name': 'Chemical Removal Only (No Natural Predators)',
-            'use_herbicide': True, 'use_pesticide': True, 'use_fertilizer': True,
-            'introduce_bats': False, 'introduce_birds': False,
-            'herbicide_stop_year': 3, 'pesticide_stop_year': 2,
-            'use_organic_fertilizer': False, 'use_cover_crop': False
-        },
-        {
-            'id': 'scenario3',
-            'name': 'Chemical Removal + Bat Introduction',
-            'use_herbicide': True, 'use_pesticide': True, 'use_fertilizer': True,
-            'introduce_bats': True, 'introduce_birds': False,
-            'herbicide_stop_year': 3, 'pesticide_stop_year': 2,
-            'use_organic_fertilizer': False, 'use_cover_crop': True
-        },
-        {
-            'id': 'scenario4',
-            'name': 'Chemical Removal + Bird Introduction',
-            'use_herbicide': True, 'use_pesticide': True, 'use_fertilizer': True,
-            'introduce_bats': False, 'introduce_birds': True,
-            'herbicide_stop_year': 3, 'pesticide_stop_year': 2,
-            'use_organic_fertilizer': False, 'use_cover_crop': True
-        },
-
-        # ============ Complete Organic Farming Solutions ============
-        {
-            'id': 'scenario5',
-            'name': 'Gradual Organic Transition',
-            'use_herbicide': True, 'use_pesticide': True, 'use_fertilizer': True,
-            'introduce_bats': True, 'introduce_birds': True,
-            'herbicide_stop_year': 4, 'pesticide_stop_year': 2,
-            'use_organic_fertilizer': True, 'use_cover_crop': True
-        },
-        {
-            'id': 'scenario6',
-            'name': 'Radical Organic (From Beginning)',
-            'use_herbicide': False, 'use_pesticide': False, 'use_fertilizer': False,
-            'introduce_bats': True, 'introduce_birds': True,
-            'herbicide_stop_year': None, 'pesticide_stop_year': None,
-            'use_organic_fertilizer': True, 'use_cover_crop': True
-        }
-    ]
-    return {s['id']: s for s in scenarios}
+    return {s['id']: dict(s) for s in _SCENARIO_LIST}
 
 
 def run_simulation(scenario_config, years=30):
     """Run simulation for a single scenario"""
-    ecosystem = AgroEcosystem(scenario_config)
+    ecosystem = AgroEcosystem(scenario_config, years)
     for year in range(years):
         ecosystem.simulate_year()
     return ecosystem.history
 
 
+def run_all_scenarios(scenario_configs, years=30, matrices=None):
+    """
+    Run all scenarios in a single batched simulation.
+
+    matrices: optional (flags, stop_years) precomputed by scenario_matrices from
+    these same configs, in the same order
+    """
+    if matrices is None:
+        matrices = scenario_matrices(scenario_configs.values())
+    flags, stop_years = matrices
+    if len(flags) != len(scenario_configs) or len(stop_years) != len(scenario_configs):
+        raise ValueError(f"matrices have {len(flags)} rows for {len(scenario_configs)} scenarios")
+    history = simulate_scenarios(flags, stop_years, years)
+    return {key: history_dict(history[i]) for i, key in enumerate(scenario_configs)}
+
+
+def run_scenarios_parallel(scenario_configs, years=30, max_workers=None):
+    """Run each scenario with run_simulation in its own worker process"""
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {key: pool.submit(run_simulation, config, years)
+                   for key, config in scenario_configs.items()}
+        return {key: future.result() for key, future in futures.items()}
+
+
+def positive_int(value):
+    """argparse type for integers >= 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description='Agricultural ecosystem scenario simulations')
+    parser.add_argument('--workers', type=positive_int, default=None,
+                        help='simulate scenarios individually across N worker processes '
+                             'instead of one batched run')
+    parser.add_argument('--show', action='store_true',
+                        help='display each figure interactively after saving it')
+    return parser.parse_args(argv)
+
+
 def print_simulation_progress(scenario_name, history):
     """Print simulation progress information"""
-    print(f"✓ Completed: {scenario_name}")
-    print(f"  Final Crop Yield: {history['crop'][-1]:.1f}")
-    print(f"  Final Bird Density: {history['bird'][-1]:.1f}")
-    print(f"  Final Bat Density: {history['bat'][-1]:.1f}")
-    print("-" * 40)
+    sys.stdout.write(f"✓ Completed: {scenario_name}\n"
+                     f"  Final Crop Yield: {history['crop'][-1]:.1f}\n"
+                     f"  Final Bird Density: {history['bird'][-1]:.1f}\n"
+                     f"  Final Bat Density: {history['bat'][-1]:.1f}\n"
+                     f"{'-' * 40}\n")
 
 
 def print_final_summary(results, scenarios):
     """Print final results summary"""
-    print("Final Results Summary (30th Year):")
-    print("-" * 80)
-    print(f"{'Scenario Name':<35} {'Crop Yield':<12} {'Bird Density':<12} {'Bat Density':<12} {'Pest Density':<12}")
-    print("-" * 80)
+    lines = [
+        "Final Results Summary (30th Year):",
+        "-" * 80,
+        f"{'Scenario Name':<35} {'Crop Yield':<12} {'Bird Density':<12} {'Bat Density':<12} {'Pest Density':<12}",
+        "-" * 80
+    ]
 
     for key, config in scenarios.items():
         h = results[key]
-        print(f"{config['name']:<35} {h['crop'][-1]:<12.1f} {h['bird'][-1]:<12.1f} "
-              f"{h['bat'][-1]:<12.1f} {h['pest'][-1]:<12.1f}")
+        lines.append(f"{config['name']:<35} {h['crop'][-1]:<12.1f} {h['bird'][-1]:<12.1f} "
+                     f"{h['bat'][-1]:<12.1f} {h['pest'][-1]:<12.1f}")
 
+    sys.stdout.write("\n".join(lines) + "\n")
 
-def main():
+
+def main(argv=None):
     """Main function: Run six scenarios and generate visualizations"""
+    args = parse_args(argv)
+    configure_matplotlib(show=args.show)
     scenarios = create_scenarios()
-    results = {}
-    evaluations = []
 
     # Run all scenarios
     print("=" * 60)
     print("Starting Agricultural Ecosystem Scenario Simulations...")
 
+    print(f"\nSimulating {len(scenarios)} scenarios...")
+    if args.workers is not None:
+        results = run_scenarios_parallel(scenarios, max_workers=args.workers)
+    else:
+        # scenarios is a fresh copy of _SCENARIO_LIST, the configs the matrices came from
+        results = run_all_scenarios(scenarios, matrices=(_FLAG_MATRIX, _STOP_YEARS))
+
     for key, config in scenarios.items():
-        print(f"\nSimulating: {config['name']}")
-        results[key] = run_simulation(config)
         print_simulation_progress(config['name'], results[key])
 
-        # Evaluate current scenario
-        eval_result = evaluate_scenario_results(results[key], config['name'], config)
-        evaluations.append(eval_result)
+    # Evaluate all scenarios in one vectorized pass
+    evaluations = evaluate_all_scenarios(results, scenarios)
 
     # Generate visualizations
     print("\n" + "=" * 60)
     print("Simulation completed! Generating visualization charts...")
+    plot_arrays = prepare_plot_arrays(results)
+
     print("\n1. Generating six-scenario comparison plot (one subplot per scenario)...")
-    plot_scenario_comparison(results, scenarios)
+    plot_scenario_comparison(results, scenarios, show=args.show, plot_arrays=plot_arrays)
 
     print("\n2. Generating variable comparison plot (same variable across scenarios)...")
-    plot_all_scenarios_together(results, scenarios)
+    plot_all_scenarios_together(results, scenarios, show=args.show, plot_arrays=plot_arrays)
 
     print("\n3. Generating result evaluation plot...")
-    plot_result_evaluation(evaluations)
+    plot_result_evaluation(evaluations, show=args.show)
 
     # Print final summary
     print_final_summary(results, scenarios)
@@ -0,0 +1,34 @@
+# plotting_common.py
+import functools
+
+import matplotlib
+from matplotlib import pyplot as plt
+
+# Shared rc settings, applied only while a plotting function runs
+PLOT_STYLE = {
+    'font.sans-serif': ['DejaVu Sans'],
+    'axes.unicode_minus': False
+}
+
+
+def configure_matplotlib(show=False):
+    """Select the backend once per run: headless Agg unless figures are shown"""
+    if not show:
+        matplotlib.use('Agg')
+
+
+def with_plot_style(func):
+    """Run a plotting function under PLOT_STYLE without touching global rcParams"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with matplotlib.rc_context(PLOT_STYLE):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def show_or_close(fig, show):
+    """Display the figure if requested, otherwise release it"""
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
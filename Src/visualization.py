@@ -2,8 +2,7 @@
 import matplotlib.pyplot as plt
 import numpy as np
 
-plt.rcParams['font.sans-serif'] = ['DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+from plotting_common import with_plot_style, show_or_close
 
 
 def _setup_plotting_configs():
@@ -40,13 +39,26 @@ def _setup_plotting_configs():
     return variables, variable_names, variable_colors, scenario_colors
 
 
-def _plot_variables(ax, history, variables, variable_names, variable_colors):
+def prepare_plot_arrays(results_dict):
+    """
+    Build the shared plotting arrays once per run.
+
+    Returns:
+        time_points: quarterly time axis in years
+        var_arrays: {variable: (n_scenarios, n_quarters) array}, scenarios in results_dict order
+    """
+    variables = _setup_plotting_configs()[0]
+    var_arrays = {var: np.stack([history[var] for history in results_dict.values()])
+                  for var in variables}
+    time_points = np.arange(var_arrays[variables[0]].shape[1]) / 4.0  # convert to years
+    return time_points, var_arrays
+
+
+def _plot_variables(ax, time_points, history, variables, variable_names, variable_colors):
     """Plot time series for multiple variables"""
     for var in variables:
         if var in history:
-            data = history[var]
-            time_points = np.arange(len(data)) / 4.0  # convert to years
-            ax.plot(time_points, data,
+            ax.plot(time_points, history[var],
                     label=variable_names[var],
                     color=variable_colors[var],
                     linewidth=1.5)
@@ -79,19 +91,23 @@ def _setup_axis_common(ax):
     ax.set_xlim(0, 30)
 
 
-def plot_scenario_comparison(results_dict, scenario_configs):
+@with_plot_style
+def plot_scenario_comparison(results_dict, scenario_configs, show=False, plot_arrays=None):
     """
     Plot comparison of key variables across 6 scenarios over 30 years.
 
     Parameters:
         results_dict: Dictionary containing simulation results for 6 scenarios
         scenario_configs: Dictionary of scenario configurations
+        show: Display the figure interactively after saving it
+        plot_arrays: Optional (time_points, var_arrays) from prepare_plot_arrays
     """
     # Get configurations
     variables, variable_names, variable_colors, _ = _setup_plotting_configs()
+    time_points, _ = plot_arrays or prepare_plot_arrays(results_dict)
 
     # Create 6 subplots (one for each scenario)
-    fig, axes = plt.subplots(2, 3, figsize=(20, 12))
+    fig, axes = plt.subplots(2, 3, figsize=(20, 12), layout='constrained')
     fig.suptitle('30-Year Simulation Results: Comparison of 6 Agricultural Ecosystem Scenarios',
                  fontsize=16, fontweight='bold')
 
@@ -105,7 +121,7 @@ def plot_scenario_comparison(results_dict, scenario_configs):
         scenario_name = scenario_configs[scenario_key]['name']
 
         # Plot variables
-        _plot_variables(ax, history, variables, variable_names, variable_colors)
+        _plot_variables(ax, time_points, history, variables, variable_names, variable_colors)
 
         # Add scenario name as subplot title
         ax.set_title(scenario_name, fontsize=12, fontweight='bold', pad=10)
@@ -121,22 +137,25 @@ def plot_scenario_comparison(results_dict, scenario_configs):
         if idx == 0:
             ax.legend(loc='upper left', fontsize=9, framealpha=0.9)
 
-    # Adjust layout and save
-    plt.tight_layout(rect=[0, 0, 1, 0.95])
-    plt.savefig('scenario_comparison.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    # Save (layout is handled by the constrained layout engine)
+    fig.savefig('scenario_comparison.png', dpi=300)
+    show_or_close(fig, show)
 
 
-def plot_all_scenarios_together(results_dict, scenario_configs):
+@with_plot_style
+def plot_all_scenarios_together(results_dict, scenario_configs, show=False, plot_arrays=None):
     """
     Compare the same variable across all 6 scenarios in a single plot.
     6 plots total, each showing one variable under all scenarios.
     """
     # Get configurations
     variables, variable_names, _, scenario_colors = _setup_plotting_configs()
+    time_points, var_arrays = plot_arrays or prepare_plot_arrays(results_dict)
+    scenario_names = [scenario_configs[key]['name'] for key in results_dict]
+    line_colors = [scenario_colors.get(key, 'black') for key in results_dict]
 
     # Create 6 subplots
-    fig, axes = plt.subplots(3, 2, figsize=(16, 14))
+    fig, axes = plt.subplots(3, 2, figsize=(16, 14), layout='constrained')
     fig.suptitle('Variable-wise Comparison Across 6 Scenarios',
                  fontsize=16, fontweight='bold')
 
@@ -146,17 +165,9 @@ def plot_all_scenarios_together(results_dict, scenario_configs):
         col = idx % 2
         ax = axes[row, col]
 
-        # Plot this variable for each scenario
-        for scenario_key, history in results_dict.items():
-            if var in history:
-                data = history[var]
-                time_points = np.arange(len(data)) / 4.0
-                scenario_name = scenario_configs[scenario_key]['name']
-
-                ax.plot(time_points, data,
-                        label=scenario_name,
-                        color=scenario_colors.get(scenario_key, 'black'),
-                        linewidth=1.5)
+        # Plot this variable for all scenarios in one call
+        ax.set_prop_cycle(color=line_colors)
+        ax.plot(time_points, var_arrays[var].T, label=scenario_names, linewidth=1.5)
 
         ax.set_title(variable_names[var], fontsize=12, fontweight='bold')
         ax.set_xlabel('Year')
@@ -168,7 +179,6 @@ def plot_all_scenarios_together(results_dict, scenario_configs):
         if idx == 0:
             ax.legend(loc='upper left', fontsize=8, framealpha=0.9)
 
-    # Adjust layout and save
-    plt.tight_layout(rect=[0, 0, 1, 0.95])
-    plt.savefig('all_scenarios_comparison_by_variable.png', dpi=300, bbox_inches='tight')
-    plt.show()
\ No newline at end of file
+    # Save (layout is handled by the constrained layout engine)
+    fig.savefig('all_scenarios_comparison_by_variable.png', dpi=300)
+    show_or_close(fig, show)
\ No newline at end of file